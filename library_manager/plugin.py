@@ -1,73 +1,120 @@
 from __future__ import annotations
 
+import atexit
 import os
 import sys
+import time
 import traceback
-import datetime as _dt
 import json as _json
 
 _INSTANCE_CHECKER = None
+_CACHE_ROOT: str | None = None
+_PLUGIN_CACHE_DIR: str | None = None
+_BOOT_LOG_PATH: str | None = None
+_PID_FILE_PATH: str | None = None
+# Boot logging is on by default; set KLM_BOOT_LOG=0 to skip it (run_library_manager.py honors it too).
+_BOOT_LOG_ENABLED = os.environ.get("KLM_BOOT_LOG", "1") != "0"
+_BOOT_LOG_BUFFER: list[str] = []
+_BOOT_LOG_FLUSH_AT = 32
+
+
+def _win_cache_root(home: str) -> str:
+    # Windows: prefer LocalAppData.
+    base = (os.environ.get("LOCALAPPDATA") or os.environ.get("APPDATA") or "").strip()
+    if base:
+        return base
+    return os.path.join(home, "AppData", "Local")
+
+
+def _mac_cache_root(home: str) -> str:
+    # macOS: conventional cache location.
+    return os.path.join(home, "Library", "Caches")
+
+
+def _posix_cache_root(home: str) -> str:
+    # Linux / other POSIX.
+    return os.path.join(home, ".cache")
+
+
+# sys.platform is fixed for the process, so pick the branch once at import.
+_PLATFORM_CACHE_ROOT = {"win32": _win_cache_root, "darwin": _mac_cache_root}.get(sys.platform, _posix_cache_root)
 
 
 def _cache_root_dir() -> str:
     """
-    Cross-platform user-local cache directory.
+    Cross-platform user-local cache directory (resolved once per process).
     """
-    # Respect XDG when set (Linux and some macOS setups).
-    try:
-        xdg = str(os.environ.get("XDG_CACHE_HOME") or "").strip()
-    except Exception:
-        xdg = ""
-    if xdg:
-        return xdg
+    global _CACHE_ROOT
+    if _CACHE_ROOT is None:
+        # Respect XDG when set (Linux and some macOS setups).
+        xdg = (os.environ.get("XDG_CACHE_HOME") or "").strip()
+        _CACHE_ROOT = xdg or _PLATFORM_CACHE_ROOT(os.path.expanduser("~"))
+    return _CACHE_ROOT
 
-    home = os.path.expanduser("~")
 
-    # Windows: prefer LocalAppData.
-    if sys.platform == "win32":
+def _plugin_cache_dir() -> str:
+    """
+    Plugin cache directory, created on first use and memoized for the process.
+    """
+    global _PLUGIN_CACHE_DIR
+    if _PLUGIN_CACHE_DIR is None:
+        d = os.path.join(_cache_root_dir(), "kicad_library_manager")
         try:
-            base = str(os.environ.get("LOCALAPPDATA") or os.environ.get("APPDATA") or "").strip()
+            os.makedirs(d, exist_ok=True)
         except Exception:
-            base = ""
-        if base:
-            return base
-        return os.path.join(home, "AppData", "Local")
+            pass
+        _PLUGIN_CACHE_DIR = d
+    return _PLUGIN_CACHE_DIR
 
-    # macOS: conventional cache location.
-    if sys.platform == "darwin":
-        return os.path.join(home, "Library", "Caches")
 
-    # Linux / other POSIX.
-    return os.path.join(home, ".cache")
+def _boot_log_path() -> str:
+    global _BOOT_LOG_PATH
+    if _BOOT_LOG_PATH is None:
+        _BOOT_LOG_PATH = os.path.join(_plugin_cache_dir(), "ipc_plugin_boot.log")
+    return _BOOT_LOG_PATH
 
 
-def _plugin_cache_dir() -> str:
-    d = os.path.join(_cache_root_dir(), "kicad_library_manager")
+def _flush_boot_log() -> None:
+    """
+    Write buffered boot log lines with a single open/append.
+    """
+    if not _BOOT_LOG_BUFFER:
+        return
     try:
-        os.makedirs(d, exist_ok=True)
+        lines = "".join(_BOOT_LOG_BUFFER)
+        _BOOT_LOG_BUFFER.clear()
+        with open(_boot_log_path(), "a", encoding="utf-8", errors="ignore") as f:
+            f.write(lines)
     except Exception:
-        pass
-    return d
+        return
 
 
-def _boot_log_path() -> str:
-    return os.path.join(_plugin_cache_dir(), "ipc_plugin_boot.log")
+atexit.register(_flush_boot_log)
 
 
 def _boot_log(msg: str) -> None:
     """
-    Always-on, best-effort boot log for IPC launch debugging.
+    Best-effort boot log for IPC launch debugging (disable with KLM_BOOT_LOG=0).
+
+    Lines are buffered and written by `_flush_boot_log()` (explicitly before
+    native-heavy steps, when the buffer fills up, and at exit).
     """
+    if not _BOOT_LOG_ENABLED:
+        return
     try:
-        ts = _dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(_boot_log_path(), "a", encoding="utf-8", errors="ignore") as f:
-            f.write(f"[{ts}] {msg}\n")
+        ts = time.strftime("%Y-%m-%d %H:%M:%S")
+        _BOOT_LOG_BUFFER.append(f"[{ts}] {msg}\n")
+        if len(_BOOT_LOG_BUFFER) >= _BOOT_LOG_FLUSH_AT:
+            _flush_boot_log()
     except Exception:
         return
 
 
 def _pid_file_path() -> str:
-    return os.path.join(_plugin_cache_dir(), "ipc_plugin_pid.json")
+    global _PID_FILE_PATH
+    if _PID_FILE_PATH is None:
+        _PID_FILE_PATH = os.path.join(_plugin_cache_dir(), "ipc_plugin_pid.json")
+    return _PID_FILE_PATH
 
 
 def _write_pid_file() -> None:
@@ -83,7 +130,7 @@ def _write_pid_file() -> None:
             "kicad_api_socket": os.environ.get("KICAD_API_SOCKET"),
         }
         with open(_pid_file_path(), "w", encoding="utf-8", errors="ignore") as f:
-            f.write(_json.dumps(payload, indent=2, sort_keys=True))
+            _json.dump(payload, f, indent=2)
             f.write("\n")
     except Exception:
         return
@@ -97,36 +144,37 @@ def _single_instance_dir() -> str:
     return _plugin_cache_dir()
 
 
-def _instance_user_key() -> str:
-    """
-    A stable per-user key for the lock name (cross-platform).
-    """
+def _compute_instance_user_key() -> str:
     try:
         return str(os.getuid())
     except Exception:
         pass
-    try:
-        u = str(os.environ.get("USERNAME") or os.environ.get("USER") or "").strip()
-        if u:
-            return u
-    except Exception:
-        pass
-    return "user"
+    u = (os.environ.get("USERNAME") or os.environ.get("USER") or "").strip()
+    return u or "user"
+
 
+# Process constants: resolved once instead of on every single-instance check.
+_INSTANCE_USER_KEY = _compute_instance_user_key()
+_HAS_OS_KILL = hasattr(os, "kill")
 
-def _pid_is_alive(pid: int) -> bool:
+
+def _instance_user_key() -> str:
+    """
+    A stable per-user key for the lock name (cross-platform).
+    """
+    return _INSTANCE_USER_KEY
+
+
+def _pid_is_alive(p: int) -> bool:
     """
     Best-effort check whether a PID is alive.
+    `p` must already be an int (see `_read_existing_pid`).
     """
-    try:
-        p = int(pid)
-    except Exception:
-        return False
     if p <= 0:
         return False
     try:
         # POSIX: signal 0 checks existence without sending a signal.
-        if hasattr(os, "kill"):
+        if _HAS_OS_KILL:
             os.kill(p, 0)
             return True
     except PermissionError:
@@ -142,38 +190,38 @@ def _pid_is_alive(pid: int) -> bool:
 
 def _read_existing_pid() -> int | None:
     try:
-        p = _pid_file_path()
-        if not os.path.isfile(p):
-            return None
-        with open(p, "r", encoding="utf-8", errors="ignore") as f:
-            txt = f.read()
-        d = _json.loads(txt or "{}")
+        with open(_pid_file_path(), "r", encoding="utf-8", errors="ignore") as f:
+            try:
+                d = _json.load(f)
+            except _json.JSONDecodeError:
+                d = {}
         pid = d.get("pid")
         return int(pid) if str(pid).isdigit() else None
     except Exception:
         return None
 
 
-def _ensure_single_instance_or_notify(app) -> bool:
+def _ensure_single_instance_or_notify(app, wx) -> bool:
     """
     Return True if this is the only running instance.
     If another instance is running, show a message and return False.
+
+    `wx` is the already-imported wx module from `main()`.
     """
     global _INSTANCE_CHECKER
     try:
-        import wx  # type: ignore
-
         # One instance per user account (not per-project).
         name = f"kicad_library_manager_single_instance_{_instance_user_key()}"
-        lock_path = os.path.join(_single_instance_dir(), name)
-        _INSTANCE_CHECKER = wx.SingleInstanceChecker(name, _single_instance_dir())
+        lock_dir = _single_instance_dir()
+        _INSTANCE_CHECKER = wx.SingleInstanceChecker(name, lock_dir)
         if _INSTANCE_CHECKER.IsAnotherRunning():
             # If we can detect that the previous instance is gone, clear stale lock artifacts
             # so we don't permanently lock out the user after a crash.
+            # Sole launches never get here, so they skip the PID file read entirely.
             existing_pid = _read_existing_pid()
             if existing_pid is not None and not _pid_is_alive(existing_pid):
                 try:
-                    os.remove(lock_path)
+                    os.remove(os.path.join(lock_dir, name))
                 except Exception:
                     pass
                 try:
@@ -181,7 +229,7 @@ def _ensure_single_instance_or_notify(app) -> bool:
                 except Exception:
                     pass
                 try:
-                    _INSTANCE_CHECKER = wx.SingleInstanceChecker(name, _single_instance_dir())
+                    _INSTANCE_CHECKER = wx.SingleInstanceChecker(name, lock_dir)
                 except Exception:
                     _INSTANCE_CHECKER = None
                 try:
@@ -230,7 +278,10 @@ def _ensure_sys_path_for_package() -> None:
     the parent directory to sys.path so `import library_manager` works.
     """
 
-    this_dir = os.path.abspath(os.path.dirname(__file__))
+    # __file__ is normally absolute already; only pay for abspath (getcwd) when it isn't.
+    this_dir = os.path.dirname(__file__)
+    if not os.path.isabs(this_dir):
+        this_dir = os.path.abspath(this_dir)
     parent = os.path.dirname(this_dir)
     if parent and parent not in sys.path:
         sys.path.insert(0, parent)
@@ -276,6 +327,8 @@ def main() -> int:
 
     _ensure_sys_path_for_package()
     _boot_log(f"sys.path[0:3]={sys.path[0:3]!r}")
+    # Persist the startup burst before loading native extensions (wx/kipy).
+    _flush_boot_log()
 
     # Import late so sys.path fix is active.
     try:
@@ -289,6 +342,19 @@ def main() -> int:
         )
         return 2
 
+    # Standalone process: we must create the wx App.
+    app = wx.App(False)
+
+    # Ensure only one instance runs at a time (per user). This runs before the
+    # kipy/plugin imports so a duplicate launch exits without paying for them.
+    if not _ensure_single_instance_or_notify(app, wx):
+        _boot_log("another instance detected; exiting")
+        return 0
+
+    # Only after passing the single-instance check, write PID file.
+    _write_pid_file()
+    _flush_boot_log()
+
     try:
         import kipy  # type: ignore
     except Exception:
@@ -305,24 +371,14 @@ def main() -> int:
         from library_manager.repo import find_repo_root_auto, find_repo_root_from_project, is_repo_root  # type: ignore
         from library_manager.ui.main_window import MainDialog  # type: ignore
     except Exception:
-        _boot_log("import failed:\n" + traceback.format_exc())
+        tb = traceback.format_exc()
+        _boot_log("import failed:\n" + tb)
         _show_error_dialog(
             "KiCad Library Manager",
-            "Failed to import plugin modules.\n\n" + traceback.format_exc(),
+            "Failed to import plugin modules.\n\n" + tb,
         )
         return 2
 
-    # Standalone process: we must create the wx App.
-    app = wx.App(False)
-
-    # Ensure only one instance runs at a time (per user).
-    if not _ensure_single_instance_or_notify(app):
-        _boot_log("another instance detected; exiting")
-        return 0
-
-    # Only after passing the single-instance check, write PID file.
-    _write_pid_file()
-
     # Resolve project path from the running pcbnew instance via IPC.
     repo_path: str | None = None
     project_dir: str = ""
@@ -373,11 +429,12 @@ def main() -> int:
                 pass
         _boot_log(f"project_path={getattr(project, 'path', None)!r} board_name={getattr(board, 'name', None)!r} repo_path={repo_path!r}")
     except Exception:
-        _boot_log("IPC connect failed:\n" + traceback.format_exc())
+        tb = traceback.format_exc()
+        _boot_log("IPC connect failed:\n" + tb)
         wx.MessageBox(
             "Could not connect to KiCad via IPC.\n\n"
             "Make sure the IPC API server is enabled in KiCad settings.\n\n"
-            f"{traceback.format_exc()}",
+            f"{tb}",
             "KiCad Library Manager",
             wx.OK | wx.ICON_ERROR,
         )
@@ -389,6 +446,8 @@ def main() -> int:
         _boot_log("repo_path not found; opening UI in setup mode")
         repo_path = ""
 
+    # Persist the IPC/repo resolution lines before building the native UI.
+    _flush_boot_log()
     frm = MainDialog(None, str(repo_path or ""), project_path=project_dir)
     app.SetTopWindow(frm)
     frm.Show()
@@ -1,26 +1,46 @@
 #!/usr/bin/env python3
 import argparse, json, os, time, hashlib, zipfile, shutil
-from datetime import datetime, timezone
 
-def sha256_file(path: str) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-def file_size(path: str) -> int:
-    return os.path.getsize(path)
-
-def zip_install_size(path: str) -> int:
-    with zipfile.ZipFile(path, "r") as z:
-        return sum(i.file_size for i in z.infolist())
+# Shared encoder for both index files (same settings as json.dumps(indent=2, ensure_ascii=False)).
+_JSON_ENCODER = json.JSONEncoder(indent=2, ensure_ascii=False)
+
+def encode_json(obj) -> bytes:
+    return _JSON_ENCODER.encode(obj).encode("utf-8") + b"\n"
+
+# Stable part of repository.json; per-run fields are merged in by main().
+_REPO_TEMPLATE = {
+    "$schema": "https://gitlab.com/kicad/code/kicad/-/raw/master/kicad/pcm/schemas/pcm.v1.schema.json#/definitions/Repository",
+}
+
+def zip_artifact_info(path: str) -> tuple[str, int, int]:
+    # (sha256, download size, install size) from a single open of the zip
+    # (file_digest needs Python 3.11+).
+    with open(path, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        sha = hashlib.file_digest(f, "sha256").hexdigest()
+        f.seek(0)
+        with zipfile.ZipFile(f, "r") as z:
+            inst = 0
+            for info in z.infolist():
+                inst += info.file_size
+    return sha, size, inst
+
+def atomic_write_bytes(path: str, data: bytes):
+    # Write to a sibling temp file and rename over the target so readers never
+    # see a truncated index if the job dies mid-write.
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
 
 def load_json_or_default(path: str, default_obj):
-    if os.path.exists(path):
+    try:
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
-    return default_obj
+    except FileNotFoundError:
+        return default_obj
 
 def main():
     ap = argparse.ArgumentParser()
@@ -59,9 +79,7 @@ def main():
 
     # Compute artifact metadata for this release
     dl_url = f"https://github.com/{args.owner}/{args.repo}/releases/download/{args.tag}/{args.asset_name}"
-    dl_sha = sha256_file(args.zip_path)
-    dl_size = file_size(args.zip_path)
-    inst_size = zip_install_size(args.zip_path)
+    dl_sha, dl_size, inst_size = zip_artifact_info(args.zip_path)
 
     version_entry = {
         "version": args.version,
@@ -87,12 +105,11 @@ def main():
     if "packages" not in pkg_array or not isinstance(pkg_array["packages"], list):
         pkg_array = {"packages": []}
 
-    # Find or create package object
-    pkg = None
+    # Find or create package object (first entry wins on duplicate identifiers)
+    by_id = {}
     for p in pkg_array["packages"]:
-        if p.get("identifier") == args.pkg_identifier:
-            pkg = p
-            break
+        by_id.setdefault(p.get("identifier"), p)
+    pkg = by_id.get(args.pkg_identifier)
 
     resources = {
         "homepage": args.author_web,
@@ -122,23 +139,23 @@ def main():
         # update resources (e.g., icon changes)
         pkg["resources"] = resources
 
-    # Upsert version
-    versions = [v for v in pkg.get("versions", []) if v.get("version") != args.version]
+    # Upsert version (newest first)
+    versions = pkg.setdefault("versions", [])
+    versions[:] = [v for v in versions if v.get("version") != args.version]
     versions.insert(0, version_entry)
-    pkg["versions"] = versions
 
-    with open(packages_path, "w", encoding="utf-8") as f:
-        json.dump(pkg_array, f, indent=2, ensure_ascii=False)
-        f.write("\n")
+    # Hash the exact bytes written instead of re-reading packages.json.
+    packages_data = encode_json(pkg_array)
+    atomic_write_bytes(packages_path, packages_data)
+    packages_sha = hashlib.sha256(packages_data).hexdigest()
 
     # repository.json (points at packages.json)
     now = int(time.time())
-    now_str = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    now_str = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(now))
     packages_url = f"{args.pages_base_url.rstrip('/')}/packages.json"
-    packages_sha = sha256_file(packages_path)
 
     repo_obj = {
-        "$schema": "https://gitlab.com/kicad/code/kicad/-/raw/master/kicad/pcm/schemas/pcm.v1.schema.json#/definitions/Repository",
+        **_REPO_TEMPLATE,
         "name": f"{args.owner}'s KiCad PCM repository",
         "maintainer": {
             "name": args.author_name,
@@ -152,9 +169,8 @@ def main():
         }
     }
 
-    with open(repo_path, "w", encoding="utf-8") as f:
-        json.dump(repo_obj, f, indent=2, ensure_ascii=False)
-        f.write("\n")
+    repo_data = encode_json(repo_obj)
+    atomic_write_bytes(repo_path, repo_data)
 
 if __name__ == "__main__":
     main()
@@ -6,6 +6,10 @@ import sys as _sys
 import json as _json
 
 
+# Boot logging is on by default; set KLM_BOOT_LOG=0 to skip it (also honored by library_manager.plugin).
+_BOOT_LOG_ENABLED = _os.environ.get("KLM_BOOT_LOG", "1") != "0"
+
+
 def _boot_log_path() -> str:
     base = _os.environ.get("XDG_CACHE_HOME") or _os.path.join(_os.path.expanduser("~"), ".cache")
     d = _os.path.join(base, "kicad_library_manager")
@@ -17,6 +21,8 @@ def _boot_log_path() -> str:
 
 
 def _boot_log(msg: str) -> None:
+    if not _BOOT_LOG_ENABLED:
+        return
     try:
         ts = _dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         with open(_boot_log_path(), "a", encoding="utf-8", errors="ignore") as f: